@@ -1,14 +1,25 @@
 #!/usr/bin/env python3
 
+import heapq
+import itertools
 import os
 import re
 import sys
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional, Union
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
+from selectolax.lexbor import LexborHTMLParser
 import mutagen
+from mutagen.flac import FLAC
 from mutagen.id3 import ID3, USLT, ID3NoHeaderError
+from mutagen.mp4 import MP4
 import difflib
+import functools
 import unicodedata
 import argparse
 from urllib.parse import quote
@@ -20,6 +31,103 @@ try:
 except ImportError:
     ARGCOMPLETE_AVAILABLE = False
 
+try:
+    from rapidfuzz import fuzz, process
+
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import requests_cache
+
+    REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    REQUESTS_CACHE_AVAILABLE = False
+
+
+class SymbolStripTable(dict):
+    """str.translate() table that deletes symbols and most punctuation.
+
+    Code points are classified the first time they are looked up, so only
+    characters that actually occur in titles are ever categorized.
+    """
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        category = unicodedata.category(char)
+        if category in ("So", "Sm", "Sk", "Sc") or (
+            category.startswith("P") and char not in "'.:()（）"
+        ):
+            self[codepoint] = None
+        else:
+            self[codepoint] = codepoint
+        return self[codepoint]
+
+
+SYMBOL_STRIP_TABLE = SymbolStripTable()
+
+
+class KashiAreaTarget:
+    """lxml parser target that keeps only the text of <div id="kashi_area">.
+
+    Everything outside the lyrics div is discarded as it is parsed, so no
+    tree is ever built for the rest of the page. <br> becomes a newline.
+    """
+
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+        self.depth = 0  # nesting depth inside the lyrics div, 0 when outside
+        self.found = False
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if self.depth:
+            self.depth += 1
+            if tag == "br":
+                self.parts.append("\n")
+        elif not self.found and tag == "div" and attrib.get("id") == "kashi_area":
+            self.depth = 1
+            self.found = True
+
+    def end(self, tag: str) -> None:
+        if self.depth:
+            self.depth -= 1
+
+    def data(self, data: str) -> None:
+        if self.depth:
+            self.parts.append(data)
+
+    def close(self) -> Optional[str]:
+        return "".join(self.parts) if self.found else None
+
+
+AUDIO_EXTENSIONS = frozenset({".mp3", ".flac", ".m4a", ".ogg", ".aac"})
+
+USER_AGENT = (
+    "uta-net-lyrics-tagger (+https://github.com/Calvin-Xu/uta-net-lyrics-tagger)"
+)
+REQUEST_TIMEOUT = 10  # seconds
+MAX_WORKERS = 8
+MAX_CONCURRENT_REQUESTS = 4  # be polite to uta-net
+CACHE_NAME = "uta-net-lyrics-tagger"
+# Artist listings and search results expire after one day, so new releases
+# show up; lyrics pages expire after 180 days, since lyrics rarely change.
+# Both are described in the README's Cache section.
+CACHE_EXPIRY = timedelta(days=1)
+LYRICS_CACHE_EXPIRY = timedelta(days=180)
+
+ARTIST_URL_RE = re.compile(r"https?://www\.uta-net\.com/artist/\d+/?")
+PAGE_COUNT_RE = re.compile(r"全(\d+)ページ中")
+BLANK_LINES_RE = re.compile(r"\n{2,}")
+KANJI_RE = re.compile(r"[\u4e00-\u9fff]+")
+
 
 class LyricsTagger:
     def __init__(
@@ -28,19 +136,86 @@ class LyricsTagger:
         artist_url: Optional[str] = None,
         per_file_search: bool = False,
         single_file: Optional[str] = None,
+        force: bool = False,
+        use_cache: bool = True,
     ):
+        self.session: requests.Session = self.create_session(use_cache)
+        self.request_slots = threading.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._easy_tag_cache: Dict[str, Optional[mutagen.FileType]] = {}
+        self._lyrics_tag_cache: Dict[str, Union[ID3, FLAC, MP4]] = {}
+        # Search results by search term; failed searches aren't cached
+        self._artist_search_cache: Dict[str, List[tuple[str, str, str]]] = {}
+        self._title_search_cache: Dict[str, List[tuple[str, str, str]]] = {}
+        # Artist URL and song list by artist tag, for --per-file
+        self._artist_catalog_cache: Dict[str, tuple[str, Dict[str, str]]] = {}
         self.directory: str = self.get_directory_path(directory)
         self.single_file: Optional[str] = single_file
         self.audio_files: List[str] = self.get_audio_files()
         self.per_file_search = per_file_search
+        self.force = force
+        # Check for existing lyrics before any network lookups, so re-running
+        # over an already tagged directory doesn't crawl the artist's songs
+        self.pending_files, self.unreadable_files = self.find_pending_files()
         self.artist_url: Optional[str] = (
-            None if per_file_search else self.get_artist_url(artist_url)
+            None
+            if per_file_search or not self.pending_files
+            else self.get_artist_url(artist_url)
         )
         self.song_entries: Dict[str, str] = (
             {}
             if per_file_search or self.artist_url is None
             else self.collect_song_entries()
         )
+        self.index_song_titles()
+
+    @staticmethod
+    def create_session(use_cache: bool = True) -> requests.Session:
+        """Create an HTTP session that keeps connections to uta-net alive between requests."""
+        if use_cache and REQUESTS_CACHE_AVAILABLE:
+            # Responses are kept in an SQLite file in the user's cache directory,
+            # so re-runs over the same artist need few or no requests
+            session = requests_cache.CachedSession(
+                CACHE_NAME,
+                backend="sqlite",
+                use_cache_dir=True,
+                expire_after=CACHE_EXPIRY,
+                urls_expire_after={"www.uta-net.com/song/*": LYRICS_CACHE_EXPIRY},
+            )
+        else:
+            session = requests.Session()
+        session.headers["User-Agent"] = USER_AGENT
+        session.mount(
+            "https://www.uta-net.com",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                # Retry dropped connections, rate limiting and transient server
+                # errors instead of failing the whole run
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                ),
+            ),
+        )
+        return session
+
+    def get_page(self, url: str, **kwargs) -> requests.Response:
+        """GET a uta-net page, limiting how many requests are in flight at once."""
+        with self.request_slots:
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def load_easy_tags(self, file_path: str) -> Optional[mutagen.FileType]:
+        """Open an audio file with easy tags, reusing the result on later calls.
+
+        Only files that may still go through the title-search pass need their
+        tags again, so a file's entry is dropped once it is skipped or matched.
+        """
+        if file_path not in self._easy_tag_cache:
+            self._easy_tag_cache[file_path] = mutagen.File(file_path, easy=True)
+        return self._easy_tag_cache[file_path]
 
     def get_directory_path(self, directory: Optional[str] = None) -> str:
         """Get directory path from argument or use current directory."""
@@ -56,34 +231,47 @@ class LyricsTagger:
 
     def get_audio_files(self) -> List[str]:
         """Get the list of audio files in the directory."""
-        audio_extensions = (".mp3", ".flac", ".m4a", ".ogg", ".aac")
-
         if self.single_file:
             if not os.path.isfile(os.path.join(self.directory, self.single_file)):
                 print(f"The specified file '{self.single_file}' does not exist.")
                 sys.exit(1)
-            if not self.single_file.lower().endswith(audio_extensions):
+            if os.path.splitext(self.single_file)[1].lower() not in AUDIO_EXTENSIONS:
                 print(
                     f"The specified file '{self.single_file}' is not a supported audio file."
                 )
                 sys.exit(1)
             return [self.single_file]
 
-        audio_files = sorted(
-            [
-                f
-                for f in os.listdir(self.directory)
-                if f.lower().endswith(audio_extensions)
-            ]
-        )
+        # scandir reports each entry's type from the directory listing itself,
+        # so directories can be skipped without an extra stat per name
+        with os.scandir(self.directory) as entries:
+            audio_files = sorted(
+                entry.name
+                for entry in entries
+                if os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS
+                and entry.is_file()
+            )
         if not audio_files:
             print("No audio files found in directory.")
             sys.exit(1)
         return audio_files
 
+    @staticmethod
+    def similarity(a: str, b: str) -> float:
+        """Return the similarity ratio (0-1) of two strings.
+
+        This is always difflib's Ratcliff/Obershelp ratio. rapidfuzz's
+        fuzz.ratio() is an LCS-based InDel score that differs from it by up
+        to 0.4 on some pairs, so it is only ever used as an upper bound.
+        """
+        return difflib.SequenceMatcher(None, a, b).ratio()
+
     @staticmethod
     def find_best_match(
-        search_term: str, candidates: List[str], threshold: float = 0.8
+        search_term: str,
+        candidates: List[str],
+        threshold: float = 0.8,
+        automaton: Optional["ahocorasick.Automaton"] = None,
     ) -> Optional[tuple[str, float]]:
         """Find the best matching string from a list of candidates using fuzzy matching.
 
@@ -91,37 +279,92 @@ class LyricsTagger:
             search_term: The string to search for
             candidates: List of strings to search through
             threshold: Minimum similarity ratio to consider a match (0-1)
+            automaton: Optional automaton over the candidates from build_automaton,
+                used to find substring matches in a single scan of the search term
 
         Returns:
             Tuple of (best matching string, similarity ratio) or None if no match found
         """
+        # An exact hit always scores 1.0, so there is no need to score anything
+        if search_term and search_term in candidates:
+            return search_term, 1.0
+
         best_match = None
         highest_ratio = 0
-        substring_match = None
 
-        for candidate in candidates:
+        if RAPIDFUZZ_AVAILABLE:
+            # fuzz.ratio() is 2 * LCS / total length. difflib's matching blocks
+            # form a common subsequence, so SequenceMatcher.ratio() never
+            # exceeds it, and rapidfuzz can drop candidates that cannot reach
+            # the threshold in C++. The survivors are still scored by difflib
+            # below, so results are the same with or without rapidfuzz. The
+            # slack allows for float rounding.
+            survivors = process.extract(
+                search_term,
+                candidates,
+                scorer=fuzz.ratio,
+                # The bound only holds on the raw strings; rapidfuzz < 3
+                # would otherwise apply utils.default_process
+                processor=None,
+                limit=None,
+                score_cutoff=threshold * 100 - 1e-6,
+            )
+            viable_candidates = [
+                candidates[index] for index in sorted(index for *_, index in survivors)
+            ]
+        else:
+            # ratio() is at most 2 * min(len) / total length, so skip candidates
+            # whose length alone keeps them below the threshold
+            search_length = len(search_term)
+            viable_candidates = [
+                candidate
+                for candidate in candidates
+                if 2 * min(search_length, len(candidate))
+                >= threshold * (search_length + len(candidate))
+            ]
+
+        matcher = difflib.SequenceMatcher(None, search_term)
+        for candidate in viable_candidates:
+            matcher.set_seq2(candidate)
+            # quick_ratio() is a cheap upper bound on ratio(), so skip
+            # candidates that could not beat the threshold or the best so far
+            upper_bound = matcher.quick_ratio()
+            if upper_bound < threshold or upper_bound <= highest_ratio:
+                continue
+
             # Calculate similarity ratio
-            ratio = difflib.SequenceMatcher(None, search_term, candidate).ratio()
+            ratio = matcher.ratio()
 
             if ratio > highest_ratio and ratio >= threshold:
                 highest_ratio = ratio
                 best_match = candidate
+                if ratio == 1.0:
+                    break
 
-            # Check for substring match if we haven't found a good match yet
-            if not best_match and candidate in search_term:
-                # If we find multiple substring matches, use the longest one
-                if not substring_match or len(candidate) > len(substring_match):
-                    substring_match = candidate
-
-        # Use substring match if no better match was found
-        if not best_match and substring_match:
-            substring_ratio = difflib.SequenceMatcher(
-                None, search_term, substring_match
-            ).ratio()
-            return substring_match, substring_ratio
-        elif best_match:
+        if best_match:
             return best_match, highest_ratio
 
+        # Fall back to the longest candidate contained in the search term
+        if automaton is not None:
+            # Prefer the earliest candidate among equally long matches
+            longest = max(
+                (match for _, match in automaton.iter(search_term)),
+                key=lambda match: (len(match[1]), -match[0]),
+                default=None,
+            )
+            substring_match = longest[1] if longest else None
+        else:
+            substring_match = max(
+                (candidate for candidate in candidates if candidate in search_term),
+                key=len,
+                default=None,
+            )
+
+        if substring_match:
+            return substring_match, LyricsTagger.similarity(
+                search_term, substring_match
+            )
+
         return None
 
     def search_artist_url(self, artist_name: str) -> Optional[tuple[str, str, str]]:
@@ -169,17 +412,18 @@ class LyricsTagger:
     def get_artist_url(self, url: Optional[str] = None) -> Optional[str]:
         """Get uta-net artist page URL from argument or auto-detect from audio files.
         Returns None if no artist URL found but title search might be possible."""
-        if url and re.match(r"https?://www\.uta-net\.com/artist/\d+/?", url):
+        if url and ARTIST_URL_RE.match(url):
             return url
 
         if not self.audio_files:
             print("No audio files found in directory.")
             sys.exit(1)
 
-        file_path = os.path.join(self.directory, self.audio_files[0])
-        audio = mutagen.File(file_path, easy=True)
+        # Detect from a file that is going to be tagged
+        file_path = os.path.join(self.directory, self.pending_files[0])
+        audio = self.load_easy_tags(file_path)
         if not audio or not audio.get("artist"):
-            print(f"Could not read artist from {self.audio_files[0]}")
+            print(f"Could not read artist from {self.pending_files[0]}")
             return None
 
         artist_name = str(audio["artist"][0])
@@ -195,13 +439,13 @@ class LyricsTagger:
 
         return artist_url
 
-    def get_total_pages(self, soup: BeautifulSoup) -> int:
+    def get_total_pages(self, tree: LexborHTMLParser) -> int:
         """Extract the total number of pages from the artist page."""
-        page_info = soup.find(
-            "div", class_="col-7 col-lg-3 text-start text-lg-end d-none d-lg-block"
+        page_info = tree.css_first(
+            "div.col-7.col-lg-3.text-start.text-lg-end.d-none.d-lg-block"
         )
         if page_info:
-            match = re.search(r"全(\d+)ページ中", page_info.text)
+            match = PAGE_COUNT_RE.search(page_info.text())
             if match:
                 return int(match.group(1))
         return 1
@@ -209,31 +453,34 @@ class LyricsTagger:
     def collect_song_entries(self) -> Dict[str, str]:
         """Collect song titles and their corresponding URLs from the artist's page."""
         song_entries = {}
-        response = requests.get(self.artist_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        total_pages = self.get_total_pages(soup)
-
-        for page_num in range(1, total_pages + 1):
-            if page_num > 1:
-                page_url = f"{self.artist_url.rstrip('/')}/0/{page_num}/"
-                response = requests.get(page_url)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, "html.parser")
-
-            rows = soup.select("tbody.songlist-table-body tr")
-            for row in rows:
-                title_span = row.select_one("td.sp-w-100 a span.songlist-title")
-                a_tag = row.select_one("td.sp-w-100 a")
+        response = self.get_page(self.artist_url)
+        first_page = LexborHTMLParser(response.content)
+
+        total_pages = self.get_total_pages(first_page)
+        page_urls = [
+            f"{self.artist_url.rstrip('/')}/0/{page_num}/"
+            for page_num in range(2, total_pages + 1)
+        ]
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            # Remaining pages download in the background while earlier ones are parsed
+            later_pages = executor.map(self.get_page, page_urls)
+            trees = itertools.chain(
+                [first_page], (LexborHTMLParser(r.content) for r in later_pages)
+            )
 
-                if not title_span or not a_tag:
-                    continue
+            for tree in trees:
+                # One query picks up every row's song link
+                song_links = tree.css("tbody.songlist-table-body tr td.sp-w-100 a")
+                for a_tag in song_links:
+                    title_span = a_tag.css_first("span.songlist-title")
+                    if not title_span:
+                        continue
 
-                song_title = title_span.get_text(strip=True)
-                song_link = a_tag["href"]
-                full_song_url = f"https://www.uta-net.com{song_link}"
-                song_entries[song_title] = full_song_url
+                    song_title = title_span.text(strip=True)
+                    song_link = a_tag.attributes["href"]
+                    full_song_url = f"https://www.uta-net.com{song_link}"
+                    song_entries[song_title] = full_song_url
 
         if not song_entries:
             print("No songs found for the given artist.")
@@ -241,36 +488,60 @@ class LyricsTagger:
 
         return song_entries
 
+    def index_song_titles(self) -> None:
+        """Normalize the collected song titles once, ahead of matching every file against them."""
+        self._cleaned_song_titles: List[str] = [
+            self.normalize_text(title) for title in self.song_entries
+        ]
+        # Create mapping of cleaned titles to original titles
+        self._title_mapping: Dict[str, str] = dict(
+            zip(self._cleaned_song_titles, self.song_entries)
+        )
+        self._title_automaton = self.build_automaton(self._cleaned_song_titles)
+
     @staticmethod
+    def build_automaton(candidates: List[str]) -> Optional["ahocorasick.Automaton"]:
+        """Build an Aho-Corasick automaton that finds every candidate inside a string in one scan."""
+        if not AHOCORASICK_AVAILABLE:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for index, candidate in enumerate(candidates):
+            # Empty strings never count as substring matches
+            if candidate and candidate not in automaton:
+                automaton.add_word(candidate, (index, candidate))
+
+        if len(automaton) == 0:
+            return None
+        automaton.make_automaton()
+        return automaton
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def normalize_text(title: str) -> str:
         """Clean title by removing emojis, symbols, and punctuation"""
         title = unicodedata.normalize("NFKC", title)
-
-        cleaned = ""
-        for char in title:
-            if unicodedata.category(char).startswith(("So", "Sm", "Sk", "Sc")):
-                continue
-            if unicodedata.category(char).startswith("P") and char not in "'.:()（）":
-                continue
-            cleaned += char
-
+        cleaned = title.translate(SYMBOL_STRIP_TABLE)
         return cleaned.lower().strip()
 
-    def match_song_title(
-        self, file_title: str, song_titles: List[str]
-    ) -> Optional[str]:
+    def match_song_title(self, file_title: str) -> Optional[str]:
         """Match the audio file's title with the collected song titles using fuzzy matching."""
         cleaned_file_title = self.normalize_text(file_title)
-        cleaned_song_titles = [self.normalize_text(title) for title in song_titles]
-
-        # Create mapping of cleaned titles to original titles
-        title_mapping = dict(zip(cleaned_song_titles, song_titles))
 
-        match_result = self.find_best_match(cleaned_file_title, cleaned_song_titles)
+        # Most tags match a catalogue title exactly once normalized; a hash
+        # lookup settles those without scanning the catalogue
+        if cleaned_file_title and cleaned_file_title in self._title_mapping:
+            match_result = (cleaned_file_title, 1.0)
+        else:
+            match_result = self.find_best_match(
+                cleaned_file_title,
+                self._cleaned_song_titles,
+                automaton=self._title_automaton,
+            )
 
         if match_result:
             matched_clean_title, ratio = match_result
-            original_title = title_mapping[matched_clean_title]
+            original_title = self._title_mapping[matched_clean_title]
             print(
                 f"Matched '{file_title}' to '{original_title}' (similarity: {ratio:.2f})"
             )
@@ -280,32 +551,92 @@ class LyricsTagger:
 
     def fetch_lyrics(self, song_url: str) -> str:
         """Fetch the lyrics from the song's page."""
-        response = requests.get(song_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        lyrics_div = soup.find("div", id="kashi_area")
-        if lyrics_div:
-            # Replace <br> tags with newlines
-            for br in lyrics_div.find_all("br"):
-                br.replace_with("\n")
-            lyrics = lyrics_div.get_text()
+        response = self.get_page(song_url)
+        # uta-net pages are UTF-8; don't rely on lxml finding a <meta charset>
+        parser = etree.HTMLParser(target=KashiAreaTarget(), encoding="utf-8")
+        lyrics = etree.fromstring(response.content, parser)
+        if lyrics is not None:
             # Replace multiple consecutive newlines with two newlines
-            lyrics = re.sub(r"\n{2,}", "\n\n", lyrics)
+            lyrics = BLANK_LINES_RE.sub("\n\n", lyrics)
             lyrics = lyrics.strip()
             return lyrics
         return ""
 
-    def write_lyrics_to_file(self, file_path: str, lyrics: str) -> None:
-        """Write the lyrics to the audio file's lyrics tag."""
-        file_ext = os.path.splitext(file_path)[1].lower()
+    def load_lyrics_tags(self, file_path: str) -> Union[ID3, FLAC, MP4]:
+        """Open the tags that hold an audio file's lyrics.
 
-        try:
+        The handle is kept so that checking for existing lyrics and writing
+        new ones share a single read of the file's tags. It is dropped as soon
+        as the file is written, skipped or fails to match, since tags can
+        carry cover art.
+        """
+        if file_path not in self._lyrics_tag_cache:
+            file_ext = os.path.splitext(file_path)[1].lower()
             if file_ext == ".mp3":
                 try:
                     tags = ID3(file_path)
                 except ID3NoHeaderError:
+                    # The header is written along with the lyrics when saved
                     tags = ID3()
-                    tags.save(file_path)
+            elif file_ext == ".flac":
+                tags = FLAC(file_path)
+            else:
+                # Handle M4A, ALAC, AAC (MP4 containers)
+                tags = MP4(file_path)
+            self._lyrics_tag_cache[file_path] = tags
+        return self._lyrics_tag_cache[file_path]
+
+    def has_lyrics(self, file_path: str) -> bool:
+        """Check whether the audio file's lyrics tag is already filled in.
+
+        Raises mutagen.MutagenError or OSError if the file's tags can't be read.
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+
+        if file_ext == ".mp3":
+            tags = self.load_lyrics_tags(file_path)
+            return any(frame.text for frame in tags.getall("USLT"))
+        elif file_ext == ".flac":
+            return bool(self.load_lyrics_tags(file_path).get("UNSYNCEDLYRICS"))
+        elif file_ext == ".m4a" or file_ext == ".aac":
+            return bool(self.load_lyrics_tags(file_path).get("\xa9lyr"))
+
+        return False
+
+    def find_pending_files(self) -> tuple[List[str], List[tuple[str, str]]]:
+        """Find the audio files that still need lyrics.
+
+        Returns the files to process and (filename, reason) pairs for files
+        whose tags could not be read. Files that already have lyrics are left
+        out unless --force is given.
+        """
+        pending_files = []
+        unreadable_files = []
+
+        for filename in self.audio_files:
+            file_path = os.path.join(self.directory, filename)
+            try:
+                # Leave files tagged by an earlier run alone unless asked to redo them
+                if not self.force and self.has_lyrics(file_path):
+                    print(f"Lyrics already present in {filename}. Skipping.")
+                    self._lyrics_tag_cache.pop(file_path, None)
+                    continue
+            except (mutagen.MutagenError, OSError) as e:
+                print(f"Could not read tags from {filename}: {str(e)}. Skipping.")
+                unreadable_files.append((filename, f"Could not read tags: {str(e)}"))
+                continue
+
+            pending_files.append(filename)
+
+        return pending_files, unreadable_files
+
+    def write_lyrics_to_file(self, file_path: str, lyrics: str) -> None:
+        """Write the lyrics to the audio file's lyrics tag."""
+        file_ext = os.path.splitext(file_path)[1].lower()
+
+        try:
+            if file_ext == ".mp3":
+                tags = self.load_lyrics_tags(file_path)
                 # Remove existing USLT frames to avoid duplication
                 tags.delall("USLT")
                 ulyrics = USLT(
@@ -314,16 +645,11 @@ class LyricsTagger:
                 tags.add(ulyrics)
                 tags.save(file_path)
             elif file_ext == ".flac":
-                from mutagen.flac import FLAC
-
-                audio = FLAC(file_path)
+                audio = self.load_lyrics_tags(file_path)
                 audio["UNSYNCEDLYRICS"] = lyrics
                 audio.save(file_path)
             elif file_ext == ".m4a" or file_ext == ".aac":
-                # Handle M4A, ALAC, AAC (MP4 containers)
-                from mutagen.mp4 import MP4
-
-                audio = MP4(file_path)
+                audio = self.load_lyrics_tags(file_path)
                 audio["\xa9lyr"] = lyrics
                 audio.save(file_path)
             else:
@@ -333,41 +659,53 @@ class LyricsTagger:
             print(f"Lyrics added to {os.path.basename(file_path)}")
         except Exception as e:
             print(f"Error adding lyrics to {os.path.basename(file_path)}: {str(e)}")
+        finally:
+            # The tags may hold cover art, so don't keep them once written
+            self._lyrics_tag_cache.pop(file_path, None)
 
     def get_title_search_results(
         self, search_term: str
     ) -> Optional[List[tuple[str, str, str]]]:
         """Perform search and return list of (title, url, artist) tuples."""
+        if search_term in self._title_search_cache:
+            return self._title_search_cache[search_term]
+
         search_url = f"https://www.uta-net.com/search/?Keyword={quote(search_term)}&Aselect=2&Bselect=3"
         try:
-            response = requests.get(search_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
+            response = self.get_page(search_url)
+            first_page = LexborHTMLParser(response.content)
 
             song_entries = []
-            total_pages = self.get_total_pages(soup)
-
-            for page_num in range(1, total_pages + 1):
-                if page_num > 1:
-                    page_url = f"{search_url}&page={page_num}"
-                    response = requests.get(page_url)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.content, "html.parser")
-
-                rows = soup.select("tbody.songlist-table-body tr")
-                for row in rows:
-                    title_link = row.select_one("td.sp-w-100 a")
-                    artist_link = row.select_one("td.sp-none a")
-                    if not title_link or not artist_link:
-                        continue
+            total_pages = self.get_total_pages(first_page)
+            page_urls = [
+                f"{search_url}&page={page_num}"
+                for page_num in range(2, total_pages + 1)
+            ]
 
-                    song_title = title_link.select_one(
-                        "span.songlist-title"
-                    ).text.strip()
-                    song_artist = artist_link.text.strip()
-                    song_url = f"https://www.uta-net.com{title_link['href']}"
-                    song_entries.append((song_title, song_url, song_artist))
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                later_pages = executor.map(self.get_page, page_urls)
+                trees = itertools.chain(
+                    [first_page], (LexborHTMLParser(r.content) for r in later_pages)
+                )
 
+                for tree in trees:
+                    rows = tree.css("tbody.songlist-table-body tr")
+                    for row in rows:
+                        title_link = row.css_first("td.sp-w-100 a")
+                        artist_link = row.css_first("td.sp-none a")
+                        if not title_link or not artist_link:
+                            continue
+
+                        song_title = title_link.css_first("span.songlist-title").text(
+                            strip=True
+                        )
+                        song_artist = artist_link.text(strip=True)
+                        song_url = (
+                            f"https://www.uta-net.com{title_link.attributes['href']}"
+                        )
+                        song_entries.append((song_title, song_url, song_artist))
+
+            self._title_search_cache[search_term] = song_entries
             return song_entries
         except requests.RequestException:
             return None
@@ -384,7 +722,7 @@ class LyricsTagger:
         search_terms.append(normalized)
 
         # Third try: kanji sequences
-        kanji_matches = list(re.finditer(r"[\u4e00-\u9fff]+", normalized))
+        kanji_matches = list(KANJI_RE.finditer(normalized))
         kanji_terms = sorted(
             [match.group() for match in kanji_matches], key=len, reverse=True
         )
@@ -392,41 +730,51 @@ class LyricsTagger:
 
         # Fourth try: word-based substrings
         words = normalized.split()
+        seen = set(search_terms)
         substrings = []
         for i in range(len(words)):
             for j in range(i + 1, len(words) + 1):
                 substring = " ".join(words[i:j])
-                if substring not in search_terms:
+                if substring not in seen:
+                    seen.add(substring)
                     substrings.append(substring)
 
-        # Sort substrings by length in descending order
-        substrings.sort(key=len, reverse=True)
-        search_terms.extend(substrings)
+        # Only the longest few substrings can make the cut below
+        search_terms.extend(heapq.nlargest(max_terms, substrings, key=len))
 
         # Return unique terms, limited to max_terms
         return list(dict.fromkeys(search_terms))[:max_terms]
 
-    def get_lyrics_by_title_search(
-        self, filename: str, file_path: str
-    ) -> Optional[tuple[bool, str]]:
-        """Try to find and fetch lyrics by searching the song title directly."""
-        audio = mutagen.File(file_path, easy=True)
+    def find_lyrics_by_title_search(
+        self, file_path: str
+    ) -> tuple[List[str], Optional[tuple[bool, str]]]:
+        """Try to find and fetch lyrics by searching the song title directly.
+
+        Searches for several files run at once, so progress messages are
+        returned for the caller to print rather than printed as they happen.
+        The result is None without a title, (False, reason) when nothing
+        was found and (True, lyrics) otherwise.
+        """
+        messages: List[str] = []
+        audio = self.load_easy_tags(file_path)
         if not audio or not audio.get("title"):
-            return None
+            return messages, None
 
         title = str(audio["title"][0])
         artist = str(audio.get("artist", [""])[0])
-        print(f"\nSearching for '{title}' by '{artist}'...")
+        messages.append(f"\nSearching for '{title}' by '{artist}'...")
 
         # Get potential search terms
         search_terms = self.extract_search_terms(title)
+        cleaned_title = self.normalize_text(title)
+        cleaned_artist = self.normalize_text(artist)
 
         best_match = None
         highest_ratio = 0
 
         # Try each search term until we find a confident match
         for search_term in search_terms:
-            print(f"Trying search term: '{search_term}'")
+            messages.append(f"Trying search term: '{search_term}'")
 
             entries = self.get_title_search_results(search_term)
             if not entries:
@@ -434,12 +782,12 @@ class LyricsTagger:
 
             # Find best match among results
             for song_title, song_url, song_artist in entries:
-                title_ratio = difflib.SequenceMatcher(
-                    None, self.normalize_text(title), self.normalize_text(song_title)
-                ).ratio()
-                artist_ratio = difflib.SequenceMatcher(
-                    None, self.normalize_text(artist), self.normalize_text(song_artist)
-                ).ratio()
+                title_ratio = self.similarity(
+                    cleaned_title, self.normalize_text(song_title)
+                )
+                artist_ratio = self.similarity(
+                    cleaned_artist, self.normalize_text(song_artist)
+                )
 
                 combined_ratio = (0.3 * title_ratio) + (0.7 * artist_ratio)
                 # print(f" - '{song_title}' by '{song_artist}': {combined_ratio:.2f}")
@@ -452,37 +800,42 @@ class LyricsTagger:
                 break
 
         if not best_match or highest_ratio < 0.3:
-            return (False, f"No confident matches found for '{title}' by '{artist}'")
+            return messages, (
+                False,
+                f"No confident matches found for '{title}' by '{artist}'",
+            )
 
         matched_title, song_url, matched_artist = best_match
-        print(
+        messages.append(
             f"\nBest match: '{matched_title}' by '{matched_artist}' (similarity: {highest_ratio:.2f})"
         )
 
         lyrics = self.fetch_lyrics(song_url)
         if not lyrics:
-            return (False, f"No lyrics found for '{matched_title}'")
-
-        print("-" * 20)
-        print(lyrics)
-        print("-" * 20)
+            return messages, (False, f"No lyrics found for '{matched_title}'")
 
-        self.write_lyrics_to_file(file_path, lyrics)
-        print(f"Successfully added lyrics to {filename} via title search")
-        return (True, "Success")
+        return messages, (True, lyrics)
 
     def process_audio_files(self, search_by_title_pass: bool = True) -> None:
         """Process each audio file in the directory to add lyrics."""
         failed_files = []
+        matched_files = []
 
-        for filename in self.audio_files:
+        for filename in self.pending_files:
             file_path = os.path.join(self.directory, filename)
-            audio = mutagen.File(file_path, easy=True)
+            audio = self.load_easy_tags(file_path)
             if not audio:
                 print(f"Could not open {filename}. Skipping.")
                 failed_files.append((filename, "Could not open file"))
                 continue
 
+            # Check the title before any per-file network lookups
+            title = audio.get("title")
+            if not title:
+                print(f"No title found for {filename}. Skipping.")
+                failed_files.append((filename, "No title found"))
+                continue
+
             # Handle per-file artist search if enabled
             if self.per_file_search:
                 artist = audio.get("artist")
@@ -492,26 +845,36 @@ class LyricsTagger:
                     continue
 
                 print(f"\nProcessing {filename} - Artist: {artist[0]}")
-                result = self.search_artist_url(str(artist[0]))
-                if not result:
-                    print(f"No artist found for {artist[0]}. Skipping.")
-                    failed_files.append((filename, f"No artist found for {artist[0]}"))
-                    continue
+                artist_name = str(artist[0])
+                if artist_name in self._artist_catalog_cache:
+                    self.artist_url, song_entries = self._artist_catalog_cache[
+                        artist_name
+                    ]
+                    print(f"Reusing song list for {artist_name}")
+                else:
+                    result = self.search_artist_url(artist_name)
+                    if not result:
+                        print(f"No artist found for {artist[0]}. Skipping.")
+                        failed_files.append(
+                            (filename, f"No artist found for {artist[0]}")
+                        )
+                        continue
 
-                self.artist_url, artist_name_found, song_count = result
-                print(f"Found artist: {artist_name_found} ({song_count})")
-                self.song_entries = self.collect_song_entries()
+                    self.artist_url, artist_name_found, song_count = result
+                    print(f"Found artist: {artist_name_found} ({song_count})")
+                    song_entries = self.collect_song_entries()
+                    self._artist_catalog_cache[artist_name] = (
+                        self.artist_url,
+                        song_entries,
+                    )
 
-            title = audio.get("title")
-            if not title:
-                print(f"No title found for {filename}. Skipping.")
-                failed_files.append((filename, "No title found"))
-                continue
+                # Tracks from the same album keep the index built for the last one
+                if song_entries is not self.song_entries:
+                    self.song_entries = song_entries
+                    self.index_song_titles()
 
             file_title = str(title[0])
-            matched_title = self.match_song_title(
-                file_title, list(self.song_entries.keys())
-            )
+            matched_title = self.match_song_title(file_title)
 
             if not matched_title:
                 print(f"No matching song found for '{file_title}'.")
@@ -521,42 +884,80 @@ class LyricsTagger:
                 continue
 
             song_url = self.song_entries[matched_title]
-            lyrics = self.fetch_lyrics(song_url)
+            matched_files.append((filename, file_path, matched_title, song_url))
+            self._easy_tag_cache.pop(file_path, None)
+
+        # Only matched files are waiting for a write; a title-search hit
+        # reopens its file's tags
+        for filename, _ in failed_files:
+            self._lyrics_tag_cache.pop(os.path.join(self.directory, filename), None)
+
+        # Download lyrics concurrently but write tags one file at a time
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            all_lyrics = executor.map(
+                self.fetch_lyrics, [song_url for *_, song_url in matched_files]
+            )
 
-            if not lyrics:
-                print(f"No lyrics found for '{matched_title}'.")
-                failed_files.append(
-                    (filename, f"No lyrics found for '{matched_title}'")
-                )
-                continue
+            for (filename, file_path, matched_title, _), lyrics in zip(
+                matched_files, all_lyrics
+            ):
+                if not lyrics:
+                    print(f"No lyrics found for '{matched_title}'.")
+                    failed_files.append(
+                        (filename, f"No lyrics found for '{matched_title}'")
+                    )
+                    self._lyrics_tag_cache.pop(file_path, None)
+                    continue
 
-            print(f"Writing lyrics to '{filename}'")
-            print("-" * 20)
-            print(lyrics)
-            print("-" * 20)
+                print(f"Writing lyrics to '{filename}'")
+                print("-" * 20)
+                print(lyrics)
+                print("-" * 20)
 
-            try:
-                self.write_lyrics_to_file(file_path, lyrics)
-            except Exception as e:
-                failed_files.append((filename, f"Error writing lyrics: {str(e)}"))
+                try:
+                    self.write_lyrics_to_file(file_path, lyrics)
+                except Exception as e:
+                    failed_files.append((filename, f"Error writing lyrics: {str(e)}"))
 
         # Try to process failed files by title search if enabled
         if search_by_title_pass and failed_files:
             print("\nAttempting to find lyrics by title search for failed files...")
             still_failed = []
+            file_paths = [
+                os.path.join(self.directory, filename) for filename, _ in failed_files
+            ]
 
-            for filename, reason in failed_files:
-                file_path = os.path.join(self.directory, filename)
-                result = self.get_lyrics_by_title_search(filename, file_path)
-
-                if result is None:
-                    still_failed.append((filename, reason))
-                elif not result[0]:  # If search failed
-                    still_failed.append((filename, result[1]))
-                # If search succeeded, file is not added to still_failed
+            # Search for all files at once, then report and write one file at a time
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                searches = executor.map(self.find_lyrics_by_title_search, file_paths)
+
+                for (filename, reason), file_path, (messages, result) in zip(
+                    failed_files, file_paths, searches
+                ):
+                    for message in messages:
+                        print(message)
+                    self._easy_tag_cache.pop(file_path, None)
+
+                    if result is None:
+                        still_failed.append((filename, reason))
+                    elif not result[0]:  # If search failed
+                        still_failed.append((filename, result[1]))
+                    else:
+                        lyrics = result[1]
+                        print("-" * 20)
+                        print(lyrics)
+                        print("-" * 20)
+
+                        self.write_lyrics_to_file(file_path, lyrics)
+                        print(
+                            f"Successfully added lyrics to {filename} via title search"
+                        )
 
             failed_files = still_failed
 
+        # Files whose tags couldn't be read never went through the passes above
+        failed_files = self.unreadable_files + failed_files
+
         # Print summary at the end
         if failed_files:
             print("\nSummary of files that failed:")
@@ -573,6 +974,9 @@ class LyricsTagger:
         self, search_term: str
     ) -> Optional[List[tuple[str, str, str]]]:
         """Perform artist search and return list of (artist_name, url, song_count) tuples."""
+        if search_term in self._artist_search_cache:
+            return self._artist_search_cache[search_term]
+
         search_url = "https://www.uta-net.com/search/"
         params = {
             "target": "art",
@@ -581,21 +985,21 @@ class LyricsTagger:
         }
 
         try:
-            response = requests.get(search_url, params=params)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
+            response = self.get_page(search_url, params=params)
+            tree = LexborHTMLParser(response.content)
 
             artist_entries = []
-            for row in soup.select("tbody.songlist-table-body tr"):
-                artist_link = row.select_one("a")
+            for row in tree.css("tbody.songlist-table-body tr"):
+                artist_link = row.css_first("a")
                 if not artist_link:
                     continue
 
-                artist_name = artist_link.select_one("span.fw-bold").text.strip()
-                song_count = artist_link.select_one("span.song-count").text.strip()
-                artist_url = f"https://www.uta-net.com{artist_link['href']}"
+                artist_name = artist_link.css_first("span.fw-bold").text(strip=True)
+                song_count = artist_link.css_first("span.song-count").text(strip=True)
+                artist_url = f"https://www.uta-net.com{artist_link.attributes['href']}"
                 artist_entries.append((artist_name, artist_url, song_count))
 
+            self._artist_search_cache[search_term] = artist_entries
             return artist_entries
         except requests.RequestException:
             return None
@@ -606,14 +1010,18 @@ def path_completer(prefix, **kwargs):
     if not ARGCOMPLETE_AVAILABLE:
         return []
 
-    audio_extensions = (".mp3", ".flac", ".m4a", ".ogg", ".aac")
     directory = os.getcwd()
     files = []
 
-    for f in os.listdir(directory):
-        if os.path.isfile(f) and f.lower().endswith(audio_extensions):
-            if not prefix or f.startswith(prefix):
-                files.append(f)
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if prefix and not entry.name.startswith(prefix):
+                continue
+            if (
+                os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS
+                and entry.is_file()
+            ):
+                files.append(entry.name)
 
     return sorted(files)
 
@@ -640,6 +1048,16 @@ def main() -> None:
         action="store_true",
         help="Disable searching by title for failed files",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Overwrite lyrics in files that already have them",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Fetch every page from uta-net instead of using the on-disk cache",
+    )
     parser.add_argument(
         "file",
         nargs="?",
@@ -656,6 +1074,8 @@ def main() -> None:
         artist_url=args.url,
         per_file_search=args.per_file,
         single_file=args.file,
+        force=args.force,
+        use_cache=not args.no_cache,
     )
     tagger.process_audio_files(search_by_title_pass=not args.no_title_search)
 